@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Dump the CSI escape sequences in a terminal capture as hex, one per line.
+
+Usage: python decode.py capture.bin
+"""
+
+import binascii
+import mmap
+import os
+import re
+import sys
+
+ESC_RE = re.compile(rb"\x1b\[[0-9;?]*[@-~]")
+
+
+def main() -> None:
+    out = sys.stdout.buffer
+    buf = bytearray()
+    with open(sys.argv[1], "rb") as f:
+        # empty captures are valid; mmap refuses zero-length files
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        # mmap keeps rss flat on mb-scale captures instead of read()ing it all
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for m in ESC_RE.finditer(mm):
+                buf += binascii.hexlify(m.group())
+                buf += b"\n"
+                if len(buf) >= 65536:
+                    out.write(buf)
+                    buf.clear()
+    if buf:
+        out.write(buf)
+
+
+if __name__ == "__main__":
+    main()
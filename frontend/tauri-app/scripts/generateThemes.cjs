@@ -13,7 +13,8 @@
  * 1. src/generated/colors.css – CSS custom properties.
  * 2. src/generated/colors.ts  – identical values as a TS export.
  * 
- * Both files are overwritten on each run.
+ * Both files are rewritten only when their content changes, so unchanged
+ * runs leave mtimes alone and don't trigger downstream rebuilds.
  */
 
 const fs = require('fs');
@@ -148,6 +149,18 @@ const DERIVED_SCALES = [
     ],
 ];
 
+// DERIVED_SCALES flattened once at load: one [name, baseRef, targetRef, p]
+// row per ramp stop, so buildPalette walks a flat table per theme
+const RAMP_PLAN = DERIVED_SCALES.flatMap(([prefix, baseRef, targetRef, stops]) =>
+    stops.map(([suffix, delta]) => [`${prefix}-${suffix}`, baseRef, targetRef, delta])
+);
+
+// opacity steps 5…100 with their padded labels and alpha strings, built once
+const OP_STEPS = Array.from({ length: 20 }, (_, i) => {
+    const pct = (i + 1) * 5;
+    return [pct.toString().padStart(2, '0'), (pct / 100).toFixed(2)];
+});
+
 const OUT_CSS = path.join("src", "generated", "colors.css");
 const OUT_TS = path.join("src", "generated", "colors.ts");
 
@@ -155,126 +168,171 @@ const OUT_TS = path.join("src", "generated", "colors.ts");
 // Helpers
 // ---------------------------------------------------------------------------
 
+// themes share colours (#ffffff, #1ebc73, …), so each hex parses only once
+const hexRgbCache = new Map();
+
 function hexToRgb(hexStr) {
-    const hex = hexStr.replace('#', '');
-    return [
-        parseInt(hex.slice(0, 2), 16),
-        parseInt(hex.slice(2, 4), 16),
-        parseInt(hex.slice(4, 6), 16)
-    ];
+    let rgb = hexRgbCache.get(hexStr);
+    if (rgb === undefined) {
+        const hex = hexStr.replace('#', '');
+        rgb = [
+            parseInt(hex.slice(0, 2), 16),
+            parseInt(hex.slice(2, 4), 16),
+            parseInt(hex.slice(4, 6), 16)
+        ];
+        hexRgbCache.set(hexStr, rgb);
+    }
+    return rgb;
 }
 
-function rgbToHex(rgb) {
-    return "#" + rgb.map(c => c.toString(16).padStart(2, '0').toUpperCase()).join('');
-}
+const HEX = Array.from({ length: 256 }, (_, i) => i.toString(16).padStart(2, '0').toUpperCase());
 
-function mix(c1, c2, p) {
+function mixRgb(rgb1, rgb2, p) {
     /**
-     * Return sRGB hex mix of c1→c2 by fractional p (e.g. 0.05).
+     * Return sRGB mix of rgb1→rgb2 by fractional p (e.g. 0.05).
      */
-    const [r1, g1, b1] = hexToRgb(c1);
-    const [r2, g2, b2] = hexToRgb(c2);
-    const mixed = [
-        Math.round(r1 + (r2 - r1) * p),
-        Math.round(g1 + (g2 - g1) * p),
-        Math.round(b1 + (b2 - b1) * p),
+    const [r1, g1, b1] = rgb1;
+    const [r2, g2, b2] = rgb2;
+    // channels are 0-255, so add-half-and-truncate matches Math.round
+    return [
+        (r1 + (r2 - r1) * p + 0.5) | 0,
+        (g1 + (g2 - g1) * p + 0.5) | 0,
+        (b1 + (b2 - b1) * p + 0.5) | 0,
     ];
-    return rgbToHex(mixed);
 }
 
 // ---------------------------------------------------------------------------
 // Compute palette
 // ---------------------------------------------------------------------------
 
+// A palette is kept struct-of-arrays: `verbatim` holds the pass-through theme
+// values with their original strings, while the computed colours live in a
+// parallel `names` list and a packed rgba Uint8Array (4 bytes per row). The
+// fourth byte marks the row kind: 0 → plain hex, 1…20 → opacity step index.
+// Strings are only formatted when the palette is materialised for emission.
+
 function buildPalette(themeColors) {
-    const palette = { ...themeColors };
+    // parse each base colour once; ramps below mix on the triples directly
+    const verbatim = Object.entries(themeColors);
+    const themeRgb = {};
+    const colours = [];
+    for (const [name, value] of verbatim) {
+        if (value.startsWith('#')) {
+            const rgb = hexToRgb(value);
+            themeRgb[name] = rgb;
+            colours.push([name, rgb]);
+        }
+    }
+
+    const total = RAMP_PLAN.length + (colours.length + RAMP_PLAN.length) * 20;
+    const names = new Array(total);
+    const rgba = new Uint8Array(total * 4);
+    let row = 0;
 
     // lighter (50–450) and darker (550–950) ramps
-    for (const [prefix, baseRef, targetRef, stops] of DERIVED_SCALES) {
-        const base = themeColors[baseRef];
-        const target = themeColors[targetRef];
-        for (const [suffix, delta] of stops) {
-            const weight = 1 - delta;  // weight = 1 is base, 0 is target
-            palette[`${prefix}-${suffix}`] = mix(base, target, 1 - weight);
-        }
+    for (const [name, baseRef, targetRef, p] of RAMP_PLAN) {
+        const rgb = mixRgb(themeRgb[baseRef], themeRgb[targetRef], p);
+        names[row] = name;
+        rgba.set(rgb, row * 4);  // alpha byte stays 0 → hex
+        colours.push([name, rgb]);
+        row++;
     }
-    
-    // -------------------------------------------------------------------
-    // Generate opacity variants (05–100 in 5% steps) only for color vars
-    // -------------------------------------------------------------------
-    const opSteps = Array.from({ length: 20 }, (_, i) => (i + 1) * 5); // 5…100
-    const fullPalette = { ...palette };
-    
-    for (const [name, hexValue] of Object.entries(palette)) {
-        // Skip non-color variables like border-radius and border-thickness
-        if (!hexValue.startsWith("#") && !hexValue.startsWith("rgb")) {
-            continue;
-        }
-        const [r, g, b] = hexToRgb(hexValue);
-        for (const pct of opSteps) {
-            const alpha = (pct / 100.0).toFixed(2);
-            fullPalette[`${name}-${pct.toString().padStart(2, '0')}`] = `rgb(${r} ${g} ${b} / ${alpha})`;
+
+    // opacity variants (05–100 in 5% steps) for every colour row
+    for (const [name, [r, g, b]] of colours) {
+        for (let step = 1; step <= 20; step++) {
+            names[row] = `${name}-${OP_STEPS[step - 1][0]}`;
+            const off = row * 4;
+            rgba[off] = r;
+            rgba[off + 1] = g;
+            rgba[off + 2] = b;
+            rgba[off + 3] = step;
+            row++;
         }
     }
-    
-    return fullPalette;
+
+    return { verbatim, names, rgba };
+}
+
+// colours repeat across themes (#ffffff, #1ebc73, …), so formatted rows are
+// cached by their packed rgba value and shared between palettes
+const rowCache = new Map();
+
+function formatRow(rgba, row) {
+    const off = row * 4;
+    const key = ((rgba[off] << 16) | (rgba[off + 1] << 8) | rgba[off + 2]) * 32 + rgba[off + 3];
+    let s = rowCache.get(key);
+    if (s === undefined) {
+        const step = rgba[off + 3];
+        s = step === 0
+            ? "#" + HEX[rgba[off]] + HEX[rgba[off + 1]] + HEX[rgba[off + 2]]
+            : `rgb(${rgba[off]} ${rgba[off + 1]} ${rgba[off + 2]} / ${OP_STEPS[step - 1][1]})`;
+        rowCache.set(key, s);
+    }
+    return s;
+}
+
+function paletteEntries(palette) {
+    const entries = palette.verbatim.slice();
+    for (let row = 0; row < palette.names.length; row++) {
+        entries.push([palette.names[row], formatRow(palette.rgba, row)]);
+    }
+    return entries.sort(([a], [b]) => a.localeCompare(b));
 }
 
 // ---------------------------------------------------------------------------
 // Emit files
 // ---------------------------------------------------------------------------
 
-function emitCss(themesPalettes) {
-    const lines = [];
-    
-    // Add theme classes
-    for (const [themeName, palette] of Object.entries(themesPalettes)) {
-        lines.push(`.theme-${themeName} {`);
-        const sortedEntries = Object.entries(palette).sort(([a], [b]) => a.localeCompare(b));
-        for (const [name, value] of sortedEntries) {
-            lines.push(`  ${name}: ${value};`);
-        }
-        lines.push('}');
-        lines.push('');
-    }
-    
-    return lines.join('\n');
+const cssLine = ([name, value]) => `  ${name}: ${value};`;
+const tsLine = ([name, value]) => `  '${name}': '${value}',\n`;
+
+function emitCss(themesEntries) {
+    // one block string per theme instead of one array entry per variable
+    return Object.entries(themesEntries)
+        .map(([themeName, sortedEntries]) =>
+            `.theme-${themeName} {\n${sortedEntries.map(cssLine).join('\n')}\n}\n`)
+        .join('\n');
 }
 
-function emitTs(palette) {
-    const lines = [
-        '// Generated – do not edit',
-        'export const COLOR_VARS: Record<string, string> = {'
-    ];
-    
-    const sortedEntries = Object.entries(palette).sort(([a], [b]) => a.localeCompare(b));
-    for (const [name, value] of sortedEntries) {
-        lines.push(`  '${name}': '${value}',`);
+function emitTs(sortedEntries) {
+    return '// Generated – do not edit\n'
+        + 'export const COLOR_VARS: Record<string, string> = {\n'
+        + sortedEntries.map(tsLine).join('')
+        + '};\n';
+}
+
+function writeIfChanged(outPath, data) {
+    // identical bytes would still bump mtime and trigger vite/ts rebuilds
+    if (fs.existsSync(outPath) && data.equals(fs.readFileSync(outPath))) {
+        return;
     }
-    
-    lines.push('};');
-    lines.push('');
-    
-    return lines.join('\n');
+    fs.writeFileSync(outPath, data);
 }
 
 function main() {
-    const themesPalettes = {};
-    let totalVars = 0;
-    
-    for (const [themeName, themeColors] of Object.entries(THEMES)) {
-        const palette = buildPalette(themeColors);
-        themesPalettes[themeName] = palette;
-        totalVars += Object.keys(palette).length;
+    // sort each palette once; css and ts emission share the sorted entries
+    const themesEntries = Object.fromEntries(
+        Object.entries(THEMES).map(([themeName, themeColors]) => [
+            themeName,
+            paletteEntries(buildPalette(themeColors)),
+        ])
+    );
+    const totalVars = Object.values(themesEntries).reduce((n, entries) => n + entries.length, 0);
+
+    // both outputs live in src/generated; create it only when missing
+    const outDir = path.dirname(OUT_CSS);
+    if (!fs.existsSync(outDir)) {
+        fs.mkdirSync(outDir, { recursive: true });
     }
-    
-    // Ensure output directories exist
-    fs.mkdirSync(path.dirname(OUT_CSS), { recursive: true });
-    fs.mkdirSync(path.dirname(OUT_TS), { recursive: true });
 
-    fs.writeFileSync(OUT_CSS, emitCss(themesPalettes));
+    // encode once and hand writeFileSync raw bytes
+    const cssData = Buffer.from(emitCss(themesEntries), 'utf8');
     // For TS, use the default theme palette
-    fs.writeFileSync(OUT_TS, emitTs(themesPalettes["dark-red"]));
+    const tsData = Buffer.from(emitTs(themesEntries["dark-red"]), 'utf8');
+
+    writeIfChanged(OUT_CSS, cssData);
+    writeIfChanged(OUT_TS, tsData);
     
     console.log(`wrote ${OUT_CSS} and ${OUT_TS} – ${Object.keys(THEMES).length} themes, ${totalVars} total vars`);
 }